@@ -6,7 +6,8 @@ source venv/bin/activate
 eval "$(ssh-agent -s)"
 ssh-add ~/.ssh/id_ed25519
 
-python dancing_stick_figures.py --daily >> ~/dancing-stick-figures/cron.log 2>&1
+# -S skips site initialisation; the script only needs the standard library
+python -S dancing_stick_figures.py --daily >> ~/dancing-stick-figures/cron.log 2>&1
 
 # Kill the SSH agent when done
 ssh-agent -k
@@ -1,115 +1,307 @@
 import os
+import sys
+import json
+import shutil
+import stat
+import pathlib
+import configparser
 import subprocess
+import asyncio
+import functools
+import collections
+import atexit
 import logging
+import logging.handlers
+import queue
 import argparse
 import datetime
 
-# Configure logging
+# Configure logging; the checks only enqueue records, and a listener thread hands them to the console
+# and to a file sink that batches writes
+_log_queue = queue.SimpleQueue()
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("git_diagnostic.log"),
-        logging.StreamHandler()
-    ]
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    # Hold up to 256 file records per write; an ERROR (or exit) flushes them immediately
+    logging.handlers.MemoryHandler(256, target=logging.FileHandler("git_diagnostic.log", delay=True)),
+    logging.StreamHandler()
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger("git_diagnostic")
 
 # Repository configuration
 REPO_NAME = "bookish-octo-fortnight"
 GITHUB_USERNAME = "klevermonicker"
 REPO_SSH_URL = f"git@github.com:{GITHUB_USERNAME}/{REPO_NAME}.git"
-REPO_PATH = os.path.expanduser(f"~/projects/{REPO_NAME}")
+REPO_PATH = pathlib.Path(f"~/projects/{REPO_NAME}").expanduser()
+
+# Clones go straight into REPO_PATH, so its parent only has to be created once
+REPO_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+# File that create_test_commit writes and commits, relative to REPO_PATH
+TEST_FILE_NAME = "test_commit.txt"
+
+# Answers given to earlier prompts, so later runs don't have to ask again
+STATE_PATH = os.path.expanduser("~/.config/git_diagnostic/state.json")
+
+# Resolve git on $PATH once instead of on every spawn
+GIT = shutil.which("git") or "git"
+
+# Constant argv, built once; commands with a variable part append it to one of these prefixes
+_CMD_FOR_EACH_REF = (GIT, "for-each-ref", "--format=%(refname):%(HEAD):%(upstream:short)", "refs/heads", "refs/remotes")
+_CMD_REMOTE_V = (GIT, "remote", "-v")
+_CMD_LOG = (GIT, "log", "-n", "10", "--oneline")
+_CMD_TEST_FILE_STATUS = (GIT, "status", "--porcelain=v2", "-z", "--untracked-files=all", "--ignored", "--", TEST_FILE_NAME)
+_CMD_ADD_TEST_FILE = (GIT, "add", "--", TEST_FILE_NAME)
+_CMD_COMMIT_ONLY = (GIT, "commit", "-o", "-m")
+_CMD_PUSH = (GIT, "push")
+_CMD_PUSH_ORIGIN = (GIT, "push", "origin")
+_CMD_ORIGIN_HEAD = (GIT, "symbolic-ref", "--quiet", "refs/remotes/origin/HEAD")
+_CMD_CLONE = (GIT, "clone")
+_CMD_FETCH_ALL = (GIT, "fetch", "--all")
+_CMD_SET_HEAD_AUTO = (GIT, "remote", "set-head", "origin", "--auto")
+_CMD_RESET_HARD = (GIT, "reset", "--hard")
+_CMD_CHECKOUT = (GIT, "checkout")
+_CMD_CHECKOUT_NEW = (GIT, "checkout", "-b")
+_CMD_CLEAN = (GIT, "clean", "-fd")
+_CMD_SET_ORIGIN_URL = (GIT, "remote", "set-url", "origin")
 
-def run_command(command, cwd=None, env=None):
-    """Run a command and return the output."""
-    logger.info(f"Running: {' '.join(command)}")
+def _log_result(returncode, stderr):
+    """Log the outcome of a finished command, decoding stderr only on failure."""
+    if returncode == 0:
+        logger.info("Command succeeded")
+    else:
+        logger.error("Command failed with exit code %s", returncode)
+        error = stderr.decode("utf-8", errors="replace").strip()
+        if error:
+            logger.error(f"Error: {error}")
+
+def _captured_output(returncode, stdout):
+    """Turn a finished command into (success, stdout) with stdout left as undecoded bytes."""
+    if returncode != 0:
+        return False, b""
+    # Only strip and decode the output if the record will actually be emitted
+    if logger.isEnabledFor(logging.INFO) and stdout.strip(b"\0\n\t "):
+        # Show NUL-separated (-z) records one per line so the log stays text
+        text = stdout.replace(b"\0", b"\n").strip()
+        logger.info("Output: %s", text.decode("utf-8", errors="replace"))
+    return True, stdout
+
+def _run(command, cwd, env, stdout):
+    """Run a command (any argv sequence, e.g. a _CMD_ tuple), logging failures, and return the CompletedProcess (None if it couldn't start)."""
+    logger.info("Running: %s", command)
     try:
         result = subprocess.run(
             command,
             cwd=cwd,
             env=env,
-            stdout=subprocess.PIPE,
+            stdout=stdout,
             stderr=subprocess.PIPE,
-            text=True,
             check=False  # Don't raise exception on error
         )
-        if result.returncode == 0:
-            logger.info("Command succeeded")
-            if result.stdout.strip():
-                logger.info(f"Output: {result.stdout.strip()}")
-            return True, result.stdout.strip()
-        else:
-            logger.error(f"Command failed with exit code {result.returncode}")
-            if result.stderr.strip():
-                logger.error(f"Error: {result.stderr.strip()}")
-            return False, result.stderr.strip()
     except Exception as e:
-        logger.error(f"Exception running command: {e}")
-        return False, str(e)
+        logger.error("Exception running command: %s", e)
+        return None
+    _log_result(result.returncode, result.stderr)
+    return result
+
+def run_check(command, cwd=None, env=None):
+    """Run a command whose output isn't needed and return whether it succeeded."""
+    result = _run(command, cwd, env, subprocess.DEVNULL)
+    return result is not None and result.returncode == 0
+
+def run_capture(command, cwd=None, env=None):
+    """Run a command and return (success, stdout) with stdout left as undecoded bytes."""
+    result = _run(command, cwd, env, subprocess.PIPE)
+    if result is None:
+        return False, b""
+    return _captured_output(result.returncode, result.stdout)
+
+async def async_run_capture(command, cwd=None, env=None):
+    """Like run_capture, but waits for the command without blocking the event loop."""
+    logger.info("Running: %s", command)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=cwd,
+            env=env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+    except Exception as e:
+        logger.error("Exception running command: %s", e)
+        return False, b""
+    _log_result(process.returncode, stderr)
+    return _captured_output(process.returncode, stdout)
+
+def _use_pidfd_child_watcher():
+    """Reap asyncio subprocesses through pidfds watched by the event loop's own selector."""
+    # Python 3.12+ already does this; before that asyncio parks a thread in waitpid() per child
+    if sys.version_info >= (3, 12) or not hasattr(os, "pidfd_open"):
+        return
+    try:
+        os.close(os.pidfd_open(os.getpid()))  # The kernel may predate pidfds (Linux < 5.3)
+    except OSError:
+        return
+    asyncio.set_child_watcher(asyncio.PidfdChildWatcher())
+
+_use_pidfd_child_watcher()
+
+BranchInfo = collections.namedtuple("BranchInfo", ["name", "remote", "current", "upstream"])
+
+# Branches of the repository, loaded by a single for-each-ref and reused for the rest of the run
+_branches = None
+
+def _store_branches(output):
+    """Parse for-each-ref output into {short name: BranchInfo} and cache it."""
+    global _branches
+    branches = {}
+    for line in filter(None, output.decode("utf-8").split("\n")):
+        # Ref names can't contain ':', so it safely separates the fields
+        refname, marker, upstream = line.split(":")
+        remote = refname.startswith("refs/remotes/")
+        name = refname[len("refs/remotes/" if remote else "refs/heads/"):]
+        branches[name] = BranchInfo(name, remote, marker == "*", upstream or None)
+    _branches = branches
+    return branches
 
+def load_branches():
+    """Read every local and remote branch once and cache it as {short name: BranchInfo}."""
+    if _branches is None:
+        success, output = run_capture(_CMD_FOR_EACH_REF, cwd=REPO_PATH)
+        if not success:
+            return None
+        _store_branches(output)
+    return _branches
+
+async def async_load_branches():
+    """Like load_branches, but awaits the for-each-ref so it can overlap other checks."""
+    if _branches is None:
+        success, output = await async_run_capture(_CMD_FOR_EACH_REF, cwd=REPO_PATH)
+        if not success:
+            return None
+        _store_branches(output)
+    return _branches
+
+def current_branch(branches):
+    """Return the name of the checked-out branch in branches, or None if HEAD is detached."""
+    return next((branch.name for branch in branches.values() if branch.current), None)
+
+@functools.lru_cache(maxsize=1)
 def check_repo_exists():
     """Check if the repository directory exists."""
-    if os.path.exists(REPO_PATH):
+    if REPO_PATH.is_dir():
         logger.info(f"Repository directory exists at {REPO_PATH}")
         return True
     else:
         logger.error(f"Repository directory does not exist at {REPO_PATH}")
         return False
 
+@functools.lru_cache(maxsize=1)
 def check_git_repo():
     """Check if the directory is a git repository."""
     if not check_repo_exists():
         return False
     
-    success, _ = run_command(["git", "rev-parse", "--is-inside-work-tree"], cwd=REPO_PATH)
-    return success
-
-def check_remote():
-    """Check the repository remote configuration."""
-    if not check_git_repo():
+    # Look for .git directly rather than starting git: a directory, or a "gitdir:" file for worktrees
+    git_path = os.path.join(REPO_PATH, ".git")
+    try:
+        mode = os.stat(git_path).st_mode
+    except OSError:
+        logger.error(f"No .git found in {REPO_PATH}")
+        return False
+    
+    if stat.S_ISREG(mode):
+        return True
+    if not stat.S_ISDIR(mode):
         return False
     
-    success, output = run_command(["git", "remote", "-v"], cwd=REPO_PATH)
+    # A real repository has a HEAD holding a symbolic ref or a commit id
+    try:
+        with open(os.path.join(git_path, "HEAD")) as f:
+            head = f.readline().strip()
+    except OSError:
+        logger.error(f"No HEAD found in {git_path}")
+        return False
+    return head.startswith("ref: ") or (len(head) in (40, 64) and all(c in "0123456789abcdef" for c in head))
+
+def invalidate_repo_state():
+    """Forget what is cached about the repository; call after anything that changes it."""
+    global _branches
+    check_repo_exists.cache_clear()
+    check_git_repo.cache_clear()
+    _branches = None
+
+def read_origin_url():
+    """Read origin's URL straight from .git/config, or None if it can't be read there."""
+    config = configparser.ConfigParser(strict=False, interpolation=None)
+    try:
+        # Only a .git directory has its own config; worktrees and the like fall back to git
+        if not config.read(os.path.join(REPO_PATH, ".git", "config")):
+            return None
+    except configparser.Error:
+        return None
+    return config.get('remote "origin"', "url", fallback=None)
+
+async def check_remote():
+    """Check the repository remote configuration (assumes check_git_repo has passed)."""
+    # The URL only changes on set-url, so a matching config file makes remote -v unnecessary
+    if read_origin_url() == REPO_SSH_URL:
+        logger.info("Remote 'origin' is correctly configured")
+        return True
+    
+    success, output = await async_run_capture(_CMD_REMOTE_V, cwd=REPO_PATH)
     if not success:
         return False
     
-    if "origin" in output and GITHUB_USERNAME in output:
+    # Probe the raw bytes; only the failure report needs decoded text
+    if b"origin" in output and GITHUB_USERNAME.encode() in output:
         logger.info("Remote 'origin' is correctly configured")
         return True
     else:
         logger.error("Remote 'origin' is not correctly configured")
         logger.info(f"Expected: {REPO_SSH_URL}")
-        logger.info(f"Actual: {output}")
+        logger.info(f"Actual: {output.decode('utf-8', errors='replace')}")
         return False
 
-def check_branches():
-    """Check what branches exist locally and remotely."""
-    if not check_git_repo():
+async def check_branches():
+    """Check what branches exist locally and remotely (assumes check_git_repo has passed)."""
+    # One for-each-ref answers all three questions
+    branches = await async_load_branches()
+    if branches is None:
+        logger.error("Failed to list branches")
         return False
     
     logger.info("Checking local branches:")
-    run_command(["git", "branch"], cwd=REPO_PATH)
+    for branch in branches.values():
+        if not branch.remote:
+            tracking = f" (tracking {branch.upstream})" if branch.upstream else ""
+            logger.info(f"{'* ' if branch.current else '  '}{branch.name}{tracking}")
     
     logger.info("Checking remote branches:")
-    run_command(["git", "branch", "-r"], cwd=REPO_PATH)
+    for branch in branches.values():
+        if branch.remote:
+            logger.info(f"  {branch.name}")
     
     # Get current branch
-    success, current_branch = run_command(["git", "rev-parse", "--abbrev-ref", "HEAD"], cwd=REPO_PATH)
-    if success:
-        logger.info(f"Current branch: {current_branch}")
+    head = current_branch(branches)
+    if head:
+        logger.info(f"Current branch: {head}")
     else:
         logger.error("Failed to get current branch")
     
     return True
 
-def check_log():
-    """Check the git log."""
-    if not check_git_repo():
-        return False
-    
+async def check_log():
+    """Check the git log (assumes check_git_repo has passed)."""
     logger.info("Checking git log (last 10 commits):")
-    success, output = run_command(["git", "log", "-n", "10", "--oneline"], cwd=REPO_PATH)
+    success, output = await async_run_capture(_CMD_LOG, cwd=REPO_PATH)
     
     if not success or not output.strip():
         logger.warning("No commits found in the git log!")
@@ -117,130 +309,227 @@ def check_log():
     
     return True
 
+async def run_diagnostics():
+    """Run the independent read-only checks concurrently and return their results."""
+    return await asyncio.gather(check_remote(), check_branches(), check_log())
+
+# Pushes started by create_test_commit that haven't been waited for yet
+_pending_pushes = []
+
+def _start_push(command):
+    """Start a push in the background and remember it so it can be waited for later."""
+    logger.info("Running in background: %s", command)
+    try:
+        process = subprocess.Popen(command, cwd=REPO_PATH, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except Exception as e:
+        logger.error("Exception running command: %s", e)
+        return False
+    _pending_pushes.append(process)
+    return True
+
+def _drain_pending_pushes():
+    """Wait for the background pushes and return whether they all succeeded."""
+    success = True
+    while _pending_pushes:
+        process = _pending_pushes.pop(0)
+        _, stderr = process.communicate()
+        _log_result(process.returncode, stderr)
+        if process.returncode != 0:
+            logger.error("Failed to push test commit")
+            success = False
+    return success
+
+# Registered after the log listener, so it runs (and logs) before the listener stops
+atexit.register(_drain_pending_pushes)
+
 def create_test_commit():
     """Create a test commit to ensure everything is working."""
     if not check_git_repo():
         return False
     
-    # Create a test file
-    test_file = os.path.join(REPO_PATH, "test_commit.txt")
+    test_file = os.path.join(REPO_PATH, TEST_FILE_NAME)
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     try:
+        # One status read, before touching the file, tells whether it is new, changed, ignored or committed as is;
+        # an existing file with no status line is tracked and clean, a missing one is not tracked yet
+        success, status = run_capture(_CMD_TEST_FILE_STATUS, cwd=REPO_PATH)
+        if not success:
+            logger.error("Failed to read the status of the test file")
+            return False
+        if status.startswith(b"!"):
+            logger.error(f"Test file {test_file} is ignored by git, so it can't be committed")
+            return False
+        if not status and os.path.exists(test_file):
+            logger.info("Test file is already committed, nothing to do")
+            return True
+        
+        # Create a test file
         with open(test_file, "w") as f:
             f.write(f"Test commit at {timestamp}\n")
         
         logger.info(f"Created test file: {test_file}")
         
-        # Get current Git email
-        success, email = run_command(["git", "config", "user.email"], cwd=REPO_PATH)
-        if success:
-            logger.info(f"Current Git email: {email}")
-        else:
-            logger.warning("Could not get current Git email")
+        # Resolve the push target from the cached refs before the commit invalidates them
+        branches = load_branches()
+        branch = current_branch(branches) if branches else None
         
-        # Add and commit the file
-        run_command(["git", "add", test_file], cwd=REPO_PATH)
-        run_command(["git", "commit", "-m", f"Test commit at {timestamp}"], cwd=REPO_PATH)
+        if not status or status.startswith(b"?"):
+            # First run: the file is new, so it has to be staged before git knows it
+            if not run_check(_CMD_ADD_TEST_FILE, cwd=REPO_PATH):
+                logger.error("Failed to add test file")
+                return False
         
-        # Check the log again
-        logger.info("Checking git log after test commit:")
-        run_command(["git", "log", "-n", "1"], cwd=REPO_PATH)
-        
-        # Push the commit
-        success, output = run_command(["git", "push"], cwd=REPO_PATH)
+        # Commit only the test file so unrelated changes in the tree aren't swept in
+        success = run_check(
+            (*_CMD_COMMIT_ONLY, f"Test commit at {timestamp}", "--", TEST_FILE_NAME),
+            cwd=REPO_PATH
+        )
+        invalidate_repo_state()  # The commit moved the branch
         if not success:
+            logger.error("Failed to commit test file")
+            return False
+        
+        # Push the commit straight to the current branch so no remote lookup is needed;
+        # the commit is already made locally, so the network round-trip finishes in the background
+        push_command = (*_CMD_PUSH_ORIGIN, branch) if branch else _CMD_PUSH
+        if not _start_push(push_command):
             logger.error("Failed to push test commit")
-            # Try to determine which branch to push to
-            success, default_branch = run_command(["git", "remote", "show", "origin"], cwd=REPO_PATH)
-            if success and "HEAD branch" in default_branch:
-                for line in default_branch.split("\n"):
-                    if "HEAD branch" in line:
-                        branch = line.split(":")[-1].strip()
-                        logger.info(f"Attempting to push to detected default branch: {branch}")
-                        run_command(["git", "push", "origin", branch], cwd=REPO_PATH)
-                        break
         
         return True
     except Exception as e:
         logger.error(f"Error creating test commit: {e}")
         return False
 
-def reset_repository():
+def get_remote_default_branch():
+    """Read origin's default branch from refs/remotes/origin/HEAD without contacting the remote."""
+    success, ref = run_capture(_CMD_ORIGIN_HEAD, cwd=REPO_PATH)
+    prefix = b"refs/remotes/origin/"
+    if success and ref.startswith(prefix):
+        return ref[len(prefix):].decode("utf-8").strip()
+    return None
+
+def load_state():
+    """Load the remembered prompt answers, or an empty dict if there are none."""
+    try:
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(key, value):
+    """Remember a prompt answer for later runs."""
+    state = load_state()
+    state[key] = value
+    try:
+        os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+        with open(STATE_PATH, "w") as f:
+            json.dump(state, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not save answer to {STATE_PATH}: {e}")
+
+def confirm_reclone(assume_yes):
+    """Decide whether to delete a broken checkout and clone it fresh."""
+    if assume_yes:
+        return True
+    # Only a refusal is ever remembered; deleting the directory always needs --assume-yes or a fresh "y"
+    if load_state().get("assume-reclone") is False:
+        logger.info(f"Not deleting the repository, as answered before (remove 'assume-reclone' from {STATE_PATH} to be asked again)")
+        return False
+    if not sys.stdin.isatty():
+        # Nobody to ask, so take the safe answer rather than hang
+        logger.info("No terminal to confirm on, not deleting the repository (use --assume-yes)")
+        return False
+    if input(f"Delete {REPO_PATH} and clone fresh? (y/n): ").strip().lower() == 'y':
+        return True
+    save_state("assume-reclone", False)
+    return False
+
+def ask_default_branch():
+    """Fall back to a remembered or user-supplied default branch name."""
+    state = load_state()
+    if state.get("default-branch"):
+        logger.info(f"Using default branch '{state['default-branch']}' answered before (stored in {STATE_PATH})")
+        return state["default-branch"]
+    if not sys.stdin.isatty():
+        logger.info("No terminal to ask on, assuming 'main' (use --default-branch)")
+        return "main"
+    default_branch = input("Enter the default branch name (main or master): ").strip() or "main"
+    save_state("default-branch", default_branch)
+    return default_branch
+
+def reset_repository(assume_yes=False, default_branch=None):
     """Reset the repository to a clean state."""
     if not check_repo_exists():
         logger.info(f"Repository directory doesn't exist. Will clone it fresh.")
-        os.makedirs(os.path.dirname(REPO_PATH), exist_ok=True)
-        run_command(["git", "clone", REPO_SSH_URL, REPO_PATH])
+        run_check((*_CMD_CLONE, REPO_SSH_URL, str(REPO_PATH)))
+        invalidate_repo_state()
         return check_git_repo()
     
     if not check_git_repo():
         logger.error(f"Directory exists but is not a git repository: {REPO_PATH}")
-        response = input(f"Delete {REPO_PATH} and clone fresh? (y/n): ").strip().lower()
-        if response == 'y':
-            import shutil
+        if confirm_reclone(assume_yes):
             shutil.rmtree(REPO_PATH)
-            os.makedirs(REPO_PATH)
-            run_command(["git", "clone", REPO_SSH_URL, REPO_PATH])
+            run_check((*_CMD_CLONE, REPO_SSH_URL, str(REPO_PATH)))
+            invalidate_repo_state()
             return check_git_repo()
         return False
     
     # Fetch the latest from remote
     logger.info("Fetching latest changes from remote")
-    run_command(["git", "fetch", "--all"], cwd=REPO_PATH)
-    
-    # Check available branches
-    success, branches = run_command(["git", "branch", "-a"], cwd=REPO_PATH)
+    run_check(_CMD_FETCH_ALL, cwd=REPO_PATH)
+    invalidate_repo_state()
     
-    if not success:
-        logger.error("Failed to list branches")
-        return False
+    # Try to identify the default branch from the locally stored origin/HEAD
+    if not default_branch:
+        default_branch = get_remote_default_branch()
     
-    # Try to identify the default branch
-    default_branch = None
-    remote_main = "remotes/origin/main" in branches
-    remote_master = "remotes/origin/master" in branches
+    if not default_branch:
+        branches = load_branches() or {}
+        if "origin/main" in branches:
+            default_branch = "main"
+        elif "origin/master" in branches:
+            default_branch = "master"
     
-    if remote_main:
-        default_branch = "main"
-    elif remote_master:
-        default_branch = "master"
+    if not default_branch:
+        # Ask the remote once to record origin/HEAD, then read it locally again
+        run_check(_CMD_SET_HEAD_AUTO, cwd=REPO_PATH)
+        default_branch = get_remote_default_branch()
     
     if not default_branch:
         logger.error("Could not identify default branch")
-        default_branch = input("Enter the default branch name (main or master): ").strip()
-        if not default_branch:
-            default_branch = "main"
+        default_branch = ask_default_branch()
     
     logger.info(f"Using default branch: {default_branch}")
     
     # Reset to the remote branch
-    success, _ = run_command(["git", "reset", "--hard", f"origin/{default_branch}"], cwd=REPO_PATH)
+    success = run_check((*_CMD_RESET_HARD, f"origin/{default_branch}"), cwd=REPO_PATH)
     if not success:
         logger.error(f"Failed to reset to origin/{default_branch}")
         return False
     
     # Switch to the default branch
-    success, _ = run_command(["git", "checkout", default_branch], cwd=REPO_PATH)
+    success = run_check((*_CMD_CHECKOUT, default_branch), cwd=REPO_PATH)
     if not success:
         logger.error(f"Failed to switch to {default_branch}")
         # Try to create the branch from remote
-        run_command(["git", "checkout", "-b", default_branch, f"origin/{default_branch}"], cwd=REPO_PATH)
+        run_check((*_CMD_CHECKOUT_NEW, default_branch, f"origin/{default_branch}"), cwd=REPO_PATH)
     
     # Clean untracked files
-    run_command(["git", "clean", "-fd"], cwd=REPO_PATH)
+    run_check(_CMD_CLEAN, cwd=REPO_PATH)
+    invalidate_repo_state()
     
     logger.info("Repository reset successfully")
     return True
 
-def fix_repository():
+async def fix_repository():
     """Fix common repository issues."""
     logger.info("Starting repository diagnostics and fixes...")
     
     if not check_repo_exists():
         logger.info("Repository doesn't exist, cloning fresh")
-        os.makedirs(os.path.dirname(REPO_PATH), exist_ok=True)
-        success, _ = run_command(["git", "clone", REPO_SSH_URL, REPO_PATH])
+        success = run_check((*_CMD_CLONE, REPO_SSH_URL, str(REPO_PATH)))
+        invalidate_repo_state()
         if not success:
             logger.error("Failed to clone repository")
             return False
@@ -249,16 +538,15 @@ def fix_repository():
         logger.error(f"{REPO_PATH} exists but is not a git repository")
         return False
     
-    # Check and fix remote
-    if not check_remote():
-        logger.info("Fixing remote configuration")
-        run_command(["git", "remote", "set-url", "origin", REPO_SSH_URL], cwd=REPO_PATH)
+    # Check remote, branches and log together; this also loads the branches the test commit needs
+    remote_ok, _, log_ok = await run_diagnostics()
     
-    # Check branches
-    check_branches()
+    # Fix remote
+    if not remote_ok:
+        logger.info("Fixing remote configuration")
+        run_check((*_CMD_SET_ORIGIN_URL, REPO_SSH_URL), cwd=REPO_PATH)
     
-    # Check log
-    if not check_log():
+    if not log_ok:
         logger.warning("No commits found in log, this might be a new repository or incorrect branch")
     
     # Create a test commit
@@ -267,6 +555,9 @@ def fix_repository():
         logger.error("Failed to create test commit")
         return False
     
+    # Report the push outcome as part of the fix rather than at exit
+    _drain_pending_pushes()
+    
     logger.info("Repository diagnostics and fixes completed")
     return True
 
@@ -276,28 +567,24 @@ if __name__ == "__main__":
     parser.add_argument("--fix", action="store_true", help="Fix repository issues")
     parser.add_argument("--reset", action="store_true", help="Reset repository to a clean state")
     parser.add_argument("--test-commit", action="store_true", help="Create a test commit")
+    parser.add_argument("--assume-yes", action="store_true", help="Delete and reclone a broken repository without asking")
+    parser.add_argument("--default-branch", help="Default branch to reset to instead of detecting it")
     
     args = parser.parse_args()
     
     if args.check:
-        check_repo_exists()
-        check_git_repo()
-        check_remote()
-        check_branches()
-        check_log()
+        if check_git_repo():
+            asyncio.run(run_diagnostics())
     elif args.reset:
-        reset_repository()
+        reset_repository(args.assume_yes, args.default_branch)
     elif args.test_commit:
         create_test_commit()
     elif args.fix:
-        fix_repository()
+        asyncio.run(fix_repository())
     else:
         # If no arguments, run the diagnosis
-        check_repo_exists()
-        check_git_repo()
-        check_remote()
-        check_branches()
-        check_log()
+        if check_git_repo():
+            asyncio.run(run_diagnostics())
         print("\nTo fix repository issues, run: python git_diagnostic.py --fix")
         print("To create a test commit, run: python git_diagnostic.py --test-commit")
         print("To reset the repository, run: python git_diagnostic.py --reset")